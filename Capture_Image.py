@@ -44,6 +44,7 @@ def takeImages():
                    [sg.Image(filename='', key='image')],[sg.Button("Back to Menu",size=(40,1))] ]
         window = sg.Window('Capture Image', layout, auto_size_buttons=False, element_justification='c', location=(350, 75))
         progress_bar = window['progressbar']
+        image_element = window['image']
         while(True):
             event, values = window.read(timeout=1)
             if event == "Back to Menu" or event == sg.WIN_CLOSED:
@@ -62,8 +63,9 @@ def takeImages():
                 #saving the captured face in the dataset folder TrainingImage
                 cv2.imwrite("TrainingImage" + os.sep +name + "."+Id + '.' +
                             str(sampleNum) + ".jpg", gray[y:y+h, x:x+w])
-                imgbytes = cv2.imencode(".png", img)[1].tobytes()
-                window["image"].update(data=imgbytes)
+                # Same PPM preview encoding as Recognize._encode_loop
+                imgbytes = cv2.imencode(".ppm", img)[1].tobytes()
+                image_element.update(data=imgbytes)
             #wait for 100 miliseconds
             if cv2.waitKey(100) & 0xFF == ord('q'):
                 break
@@ -1,35 +1,184 @@
 import datetime
+import functools
+import math
 import os
+import queue
+import threading
 import time
+import traceback
 import PySimpleGUI as sg
 import cv2
 import pandas as pd
 import numpy as np
-from scipy.spatial import distance as dist
 
-def eye_aspect_ratio(eye):
+# numba is in requirements.txt; without it the small numeric kernels run
+# as plain Python/numpy
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+# Frame rate requested from the camera; also paces the capture and GUI loops
+CAMERA_FPS = 30
+
+# Show movement and texture scores in the liveness status messages
+DEBUG_MODE = False
+
+# Blink detection: EAR below the threshold for this many consecutive frames is a blink
+EYE_AR_THRESH = 0.21
+EYE_AR_CONSEC_FRAMES = 2
+
+# Face detection and recognition run on one frame in SKIP_FRAMES; the frames
+# in between reuse the last boxes and identities (blink analysis runs on all)
+SKIP_FRAMES = 3
+
+# Face detection runs on the grayscale frame downscaled by this factor
+DETECT_SCALE = 0.5
+
+# Largest size of the camera preview shown in the GUI. Display only:
+# detection and recognition use the full camera frame
+PREVIEW_SIZE = (480, 360)
+
+# Fixed size that face crops are resized to for frame-to-frame comparison,
+# and how many of them are kept (the movement score reads the last 5)
+LIVENESS_FRAME_SIZE = (64, 64)
+LIVENESS_HISTORY = 8
+
+# Status text templates, formatted by set_status
+NO_FACE_TEXT = '❌ No face detected'
+FACE_TEXT = '✅ Face detected'
+NO_BLINK_TEXT = 'No blink detected'
+PIPELINE_ERROR_TEXT = '⚠️ Recognition stopped (see console)'
+BLINK_TMPL = '✅ Blink detected ({}) ({})'
+EYES_OPEN_TMPL = '👁️ Eyes open ({})'
+LIVE_BLINK_TMPL = '✅ {} ({})'
+STATIC_IMAGE_TMPL = '❌ {}'
+LIVENESS_STATUS_TMPL = '👁️ {}'
+NAME_TMPL = 'Name: {}'
+ID_TMPL = 'ID: {}'
+CONFIDENCE_TMPL = '{}%'
+
+# Face label style. The confidence text is drawn in red, yellow or green
+# (BGR) for confidence up to 50%, up to 67% and above 67%
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_COLOR = (255, 255, 255)
+COLOR_LUT = ((0, 0, 255), (0, 255, 255), (0, 255, 0))
+
+class FrameRing:
+    """
+    Fixed-size ring buffer of grayscale frames for temporal analysis.
+    Frames are resized into a preallocated (size, height, width) array,
+    so pushing a frame does not allocate
+    """
+    def __init__(self, size, frame_size):
+        width, height = frame_size
+        self.buf = np.empty((size, height, width), dtype=np.uint8)
+        self.write_idx = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def push(self, frame):
+        cv2.resize(frame, (self.buf.shape[2], self.buf.shape[1]), dst=self.buf[self.write_idx], interpolation=cv2.INTER_AREA)
+        self.write_idx = (self.write_idx + 1) % len(self.buf)
+        self.count = min(self.count + 1, len(self.buf))
+
+    def movement_score(self):
+        """
+        Frame-difference movement score of the last 5 frames
+        """
+        return _liveness_score(self.buf, self.write_idx)
+
+# Structuring element for cleaning up the thresholded eye regions
+EYE_OPEN_KERNEL = np.ones((3, 3), dtype=np.uint8)
+
+@functools.lru_cache(maxsize=16)
+def _eye_slices(height, width):
     """
-    Calculate the eye aspect ratio (EAR) to detect blinks
+    Row slice and left/right eye column slices of a face crop of the given size
     """
+    return (slice(int(height*0.2), int(height*0.5)),
+            slice(int(width*0.1), int(width*0.45)),
+            slice(int(width*0.55), int(width*0.9)))
+
+@njit(cache=True, fastmath=True)
+def _eye_aspect_ratio(eye):
     # Compute the euclidean distances between the vertical eye landmarks
-    A = dist.euclidean(eye[1], eye[5])
-    B = dist.euclidean(eye[2], eye[4])
+    A = math.hypot(eye[1, 0] - eye[5, 0], eye[1, 1] - eye[5, 1])
+    B = math.hypot(eye[2, 0] - eye[4, 0], eye[2, 1] - eye[4, 1])
     
     # Compute the euclidean distance between the horizontal eye landmarks
-    C = dist.euclidean(eye[0], eye[3])
+    C = math.hypot(eye[0, 0] - eye[3, 0], eye[0, 1] - eye[3, 1])
     
     # Compute the eye aspect ratio
     ear = (A + B) / (2.0 * C)
     return ear
 
-def detect_blink_opencv(face_roi, eye_cascade):
+@njit(cache=True, fastmath=True)
+def _eye_aspect_ratios(eyes):
+    ears = np.empty(eyes.shape[0])
+    for i in range(eyes.shape[0]):
+        ears[i] = _eye_aspect_ratio(eyes[i])
+    return ears
+
+def eye_aspect_ratios(eyes):
+    """
+    Calculate the EAR of several eyes at once from an (n, 6, 2) array of eye landmarks
+    """
+    return _eye_aspect_ratios(np.asarray(eyes, dtype=np.float32))
+
+@njit(cache=True, fastmath=True)
+def closed_eye(area, w, h):
+    """
+    Decide from the largest eye contour whether the eye looks closed
+    """
+    aspect_ratio = w / h if h > 0 else 0.0
+    return area < 30 or aspect_ratio < 0.3
+
+@njit(cache=True, fastmath=True)
+def _sum_abs_diff(a, b):
+    return np.abs(a.astype(np.int16) - b.astype(np.int16)).sum()
+
+@njit(cache=True, fastmath=True)
+def _liveness_score(frames, write_idx):
+    """
+    Movement score over the (n, height, width) frame array of a FrameRing:
+    the larger of the mean absolute difference between the newest frame and
+    the one two frames earlier, and the mean over the last 4 consecutive pairs
+    """
+    n = frames.shape[0]
+    newest = frames[(write_idx - 1) % n]
+    movement = _sum_abs_diff(newest, frames[(write_idx - 3) % n]) / newest.size
+    recent_total = 0.0
+    for k in range(4):
+        recent_total += _sum_abs_diff(frames[(write_idx - 1 - k) % n], frames[(write_idx - 2 - k) % n])
+    return max(movement, recent_total / (4 * newest.size))
+
+def warm_up_kernels():
+    """
+    Compile the numba kernels ahead of time so the first frame isn't slow
+    """
+    eye_aspect_ratios(np.array([[(0, 1), (1, 0), (2, 0), (3, 1), (2, 2), (1, 2)]], dtype=np.int32))
+    closed_eye(0.0, 1, 1)
+    _liveness_score(np.zeros((5, 2, 2), dtype=np.uint8), 0)
+
+def detect_blink_opencv(gray_face, eye_cascade):
     """
     Detect eye blinks using OpenCV Haar cascades and contour analysis
+    on a grayscale face crop
     """
-    gray_face = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
-    
-    # Detect eyes using Haar cascade
-    eyes = eye_cascade.detectMultiScale(gray_face, scaleFactor=1.1, minNeighbors=5, minSize=(20, 20))
+    # Detect eyes using Haar cascade. The eyes are in the upper half of the
+    # face and are at least about an eighth of its width, so the cascade
+    # only searches there, with coarser scale steps
+    upper = gray_face[:gray_face.shape[0] // 2]
+    min_eye = max(15, upper.shape[1] // 8)
+    eyes = eye_cascade.detectMultiScale(upper, scaleFactor=1.2, minNeighbors=3, minSize=(min_eye, min_eye),
+                                        flags=cv2.CASCADE_SCALE_IMAGE)
     
     if len(eyes) >= 2:  # At least 2 eyes detected
         blink_count = 0
@@ -57,19 +206,18 @@ def detect_blink_opencv(face_roi, eye_cascade):
     
     return False
 
-def detect_blink_contour(face_roi):
+def detect_blink_contour(gray_face):
     """
     Alternative blink detection using contour analysis of eye regions
+    of a grayscale face crop
     """
-    gray_face = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
-    
     # Define approximate eye regions (relative to face)
-    height, width = gray_face.shape
+    eye_rows, left_cols, right_cols = _eye_slices(*gray_face.shape)
     
     # Left eye region (approximately)
-    left_eye_roi = gray_face[int(height*0.2):int(height*0.5), int(width*0.1):int(width*0.45)]
+    left_eye_roi = gray_face[eye_rows, left_cols]
     # Right eye region (approximately)
-    right_eye_roi = gray_face[int(height*0.2):int(height*0.5), int(width*0.55):int(width*0.9)]
+    right_eye_roi = gray_face[eye_rows, right_cols]
     
     def analyze_eye_region(eye_roi):
         if eye_roi.size == 0:
@@ -105,50 +253,32 @@ def detect_blink_contour(face_roi):
     # Return True if both eyes appear to be closed (blinking)
     return left_eye_closed and right_eye_closed
 
-def detect_liveness_blink(face_roi, prev_frames, frame_count):
+def detect_liveness_blink(gray_face, prev_frames, frame_count):
     """
     Advanced liveness detection using temporal analysis and micro-movements
+    of a grayscale face crop
     """
-    gray_face = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
-    
-    # Store current frame for temporal analysis
-    if len(prev_frames) >= 10:
-        prev_frames.pop(0)
-    prev_frames.append(gray_face.copy())
+    # Store current frame for temporal analysis. prev_frames is a FrameRing;
+    # the crop is resized so that frames of different face sizes can be compared
+    prev_frames.push(gray_face)
     
     if len(prev_frames) < 5:  # Need at least 5 frames for analysis
         return False, "Insufficient frames"
     
     # Method 1: Frame difference analysis (detects movement) - improved for real faces
-    frame_diff = cv2.absdiff(prev_frames[-1], prev_frames[-3])  # Compare with closer frame
-    movement_score = np.mean(frame_diff)
+    movement_score = prev_frames.movement_score()
     
-    # Also check for any movement in recent frames
-    if len(prev_frames) >= 5:
-        recent_movement = np.mean([np.mean(cv2.absdiff(prev_frames[i], prev_frames[i-1])) for i in range(-4, 0)])
-        movement_score = max(movement_score, recent_movement)
-    
-    # Method 2: Laplacian variance (detects texture changes)
-    laplacian_var = cv2.Laplacian(gray_face, cv2.CV_64F).var()
+    # Method 2: Laplacian variance (detects texture changes).
+    # CV_32F halves the memory traffic of CV_64F, and the variance is the
+    # squared standard deviation from a single cv2.meanStdDev pass
+    laplacian = cv2.Laplacian(gray_face, cv2.CV_32F)
+    _, laplacian_std = cv2.meanStdDev(laplacian)
+    laplacian_var = float(laplacian_std[0, 0]) ** 2
     
     # Method 3: Eye region temporal analysis
-    height, width = gray_face.shape
-    left_eye_roi = gray_face[int(height*0.2):int(height*0.5), int(width*0.1):int(width*0.45)]
-    right_eye_roi = gray_face[int(height*0.2):int(height*0.5), int(width*0.55):int(width*0.9)]
-    
-    # Calculate eye region variance over time
-    if len(prev_frames) >= 3:
-        left_eye_prev = prev_frames[-3][int(height*0.2):int(height*0.5), int(width*0.1):int(width*0.45)]
-        right_eye_prev = prev_frames[-3][int(height*0.2):int(height*0.5), int(width*0.55):int(width*0.9)]
-        
-        left_eye_diff = cv2.absdiff(left_eye_roi, left_eye_prev)
-        right_eye_diff = cv2.absdiff(right_eye_roi, right_eye_prev)
-        
-        left_eye_movement = np.mean(left_eye_diff)
-        right_eye_movement = np.mean(right_eye_diff)
-    else:
-        left_eye_movement = 0
-        right_eye_movement = 0
+    eye_rows, left_cols, right_cols = _eye_slices(*gray_face.shape)
+    left_eye_roi = gray_face[eye_rows, left_cols]
+    right_eye_roi = gray_face[eye_rows, right_cols]
     
     # Simplified liveness detection - more reliable for real faces
     
@@ -172,17 +302,17 @@ def detect_liveness_blink(face_roi, prev_frames, frame_count):
         right_eye_closed = analyze_eye_region_for_liveness(right_eye_roi)
         
         if left_eye_closed and right_eye_closed:
-            if debug_mode:
+            if DEBUG_MODE:
                 return True, f"Live blink (M:{movement_score:.1f}, T:{laplacian_var:.0f})"
             else:
                 return True, f"Live blink detected (movement: {movement_score:.1f})"
         else:
-            if debug_mode:
+            if DEBUG_MODE:
                 return False, f"Eyes open (M:{movement_score:.1f}, T:{laplacian_var:.0f})"
             else:
                 return False, f"Eyes open (live) (movement: {movement_score:.1f})"
     else:
-        if debug_mode:
+        if DEBUG_MODE:
             return False, f"Static (M:{movement_score:.1f}, T:{laplacian_var:.0f})"
         else:
             return False, f"Static image detected (movement: {movement_score:.1f})"
@@ -197,60 +327,199 @@ def analyze_eye_region_for_liveness(eye_roi):
     # Apply multiple filters for better detection
     blurred = cv2.GaussianBlur(eye_roi, (5, 5), 0)
     
-    # Use multiple thresholding methods
-    _, thresh1 = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-    thresh2 = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2)
-    
-    # Combine both thresholding results
-    combined_thresh = cv2.bitwise_and(thresh1, thresh2)
+    # Otsu threshold, with a morphological opening to drop the speckle that
+    # the adaptive threshold used to mask out
+    _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, EYE_OPEN_KERNEL)
     
     # Find contours
-    contours, _ = cv2.findContours(combined_thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     
     if contours:
         # Find the largest contour
         largest_contour = max(contours, key=cv2.contourArea)
         area = cv2.contourArea(largest_contour)
         
-        # Calculate aspect ratio of the contour
-        x, y, w, h = cv2.boundingRect(largest_contour)
-        aspect_ratio = float(w) / h if h > 0 else 0
-        
         # More strict criteria for liveness detection
-        return area < 30 or aspect_ratio < 0.3
+        x, y, w, h = cv2.boundingRect(largest_contour)
+        return closed_eye(area, w, h)
     
     return False
 
-def detect_blink(shape, detector):
+@functools.lru_cache(maxsize=1)
+def _load_recognizer(path, mtime):
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.read(path)
+    return recognizer
+
+def _get_recognizer():
     """
-    Detect if eyes are blinking using facial landmarks
+    LBPH recognizer trained by Train_Image, reloaded only when the model file changes
     """
-    # Define constants for blink detection
-    EYE_AR_THRESH = 0.21
-    EYE_AR_CONSEC_FRAMES = 2
-    
-    # Get the facial landmarks
-    gray = cv2.cvtColor(shape, cv2.COLOR_BGR2GRAY)
-    rects = detector.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
-    
-    for (x, y, w, h) in rects:
-        # Get facial landmarks
-        shape = detector.predict(gray[y:y+h, x:x+w])
-        
-        # Extract the left and right eye coordinates
-        leftEye = shape[42:48]
-        rightEye = shape[36:42]
-        
-        # Calculate the eye aspect ratio for both eyes
-        leftEAR = eye_aspect_ratio(leftEye)
-        rightEAR = eye_aspect_ratio(rightEye)
-        
-        # Average the eye aspect ratio together for both eyes
-        ear = (leftEAR + rightEAR) / 2.0
-        
-        return ear < EYE_AR_THRESH
+    path = "TrainingImageLabel"+os.sep+"Trainner.yml"
+    return _load_recognizer(path, os.path.getmtime(path))
+
+@functools.lru_cache(maxsize=1)
+def _get_face_cascade():
+    return cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+
+@functools.lru_cache(maxsize=1)
+def _get_eye_cascade():
+    """
+    Eye cascade classifier for OpenCV blink detection, or None if it can't be loaded
+    """
+    try:
+        eye_cascade_path = cv2.data.haarcascades + 'haarcascade_eye.xml'
+        if os.path.exists(eye_cascade_path):
+            eye_cascade = cv2.CascadeClassifier(eye_cascade_path)
+            print("OpenCV eye cascade loaded successfully!")
+        else:
+            # Try alternative path
+            eye_cascade_path = "haarcascade_eye.xml"
+            if os.path.exists(eye_cascade_path):
+                eye_cascade = cv2.CascadeClassifier(eye_cascade_path)
+                print("Alternative eye cascade loaded successfully!")
+            else:
+                print("Eye cascade not found. Using contour-based blink detection.")
+                eye_cascade = None
+    except Exception as e:
+        print(f"Error loading eye cascade: {e}")
+        eye_cascade = None
+    return eye_cascade
+
+@functools.lru_cache(maxsize=1)
+def _get_dlib_models():
+    """
+    dlib face detector and 68-point shape predictor, or (None, None) if dlib
+    or the predictor file isn't available. The predictor is ~100MB, so it is
+    only loaded once per process
+    """
+    try:
+        import dlib
+        predictor_path = "shape_predictor_68_face_landmarks.dat"
+        if os.path.exists(predictor_path):
+            detector = dlib.get_frontal_face_detector()
+            predictor = dlib.shape_predictor(predictor_path)
+            print("dlib facial landmarks available as backup!")
+            return detector, predictor
+    except ImportError:
+        print("dlib not available. Using OpenCV-based blink detection.")
+    except Exception as e:
+        print(f"dlib initialization error: {e}")
+    return None, None
+
+@functools.lru_cache(maxsize=1)
+def _load_name_by_id(path, mtime):
+    df = pd.read_csv(path)
+    return dict(zip(df['Id'].astype(int).tolist(), df['Name'].tolist()))
+
+def _get_name_by_id():
+    """
+    Id -> name mapping of the student details written by Capture_Image,
+    reloaded only when the file changes
+    """
+    path = "StudentDetails"+os.sep+"StudentDetails.csv"
+    return _load_name_by_id(path, os.path.getmtime(path))
+
+def shape_to_np(landmarks, out, start=0, end=68):
+    """
+    Copy dlib landmark points start..end-1 into a preallocated (68, 2) int32 array
+    """
+    for i in range(start, end):
+        point = landmarks.part(i)
+        out[i, 0] = point.x
+        out[i, 1] = point.y
+    return out
+
+def _put_until_stopped(q, item, stop_event):
+    """
+    Put an item on a bounded queue, waiting for room unless the pipeline is stopped
+    """
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            pass
+
+def _capture_loop(cam, capture_q, stop_event):
+    """
+    Pipeline stage 1: read BGR frames from the camera. The camera is
+    released here once the pipeline stops, so release() never runs while
+    a read() is still blocked on it
+    """
+    frame_interval = 1.0 / CAMERA_FPS
+    try:
+        while not stop_event.is_set():
+            started = time.perf_counter()
+            ret, im = cam.read()
+            if ret:
+                _put_until_stopped(capture_q, im, stop_event)
+            # Don't poll faster than the camera frame rate, e.g. when read()
+            # fails straight away because the camera is busy or unplugged
+            remaining = frame_interval - (time.perf_counter() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+    finally:
+        cam.release()
+
+def _detect_loop(process_frame, capture_q, detect_q, stop_event):
+    """
+    Pipeline stage 2: face detection, recognition and blink analysis
+    """
+    while not stop_event.is_set():
+        try:
+            im = capture_q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        try:
+            result = process_frame(im)
+        except Exception:
+            traceback.print_exc()
+            # Pass a None down the pipeline so the GUI knows detection stopped
+            _put_until_stopped(detect_q, None, stop_event)
+            return
+        _put_until_stopped(detect_q, result, stop_event)
+
+def _preview_size(width, height):
+    """
+    Size that fits a frame into PREVIEW_SIZE keeping its aspect ratio.
+    Frames are only ever scaled down
+    """
+    scale = min(1.0, PREVIEW_SIZE[0] / width, PREVIEW_SIZE[1] / height)
+    return round(width * scale), round(height * scale)
+
+def _encode_loop(detect_q, display_q, stop_event):
+    """
+    Pipeline stage 3: encode processed frames for the GUI preview
+    """
+    # Reused buffer for frames that need resizing to the preview size
+    preview = None
     
-    return False
+    while not stop_event.is_set():
+        try:
+            item = detect_q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is None:
+            # Detection failed; forward the failure to the GUI
+            _put_until_stopped(display_q, None, stop_event)
+            return
+        im, ui, Id, aa = item
+        try:
+            height, width = im.shape[:2]
+            size = _preview_size(width, height)
+            if size != (width, height):
+                if preview is None or preview.shape[1::-1] != size:
+                    preview = np.empty((size[1], size[0], 3), dtype=np.uint8)
+                im = cv2.resize(im, size, dst=preview, interpolation=cv2.INTER_AREA)
+            # Uncompressed PPM is much cheaper to encode than PNG and Tk reads it natively
+            imgbytes = cv2.imencode(".ppm", im)[1].tobytes()
+        except Exception:
+            traceback.print_exc()
+            _put_until_stopped(display_q, None, stop_event)
+            return
+        _put_until_stopped(display_q, (imgbytes, ui, Id, aa), stop_event)
 
 def recognize_attendence():
     # Professional dark theme with modern colors
@@ -291,7 +560,7 @@ def recognize_attendence():
             sg.Column([
                 [sg.Frame('', [
                     [sg.Text('📹 LIVE CAMERA FEED', font=('Segoe UI', 16, 'bold'), text_color=ACCENT_COLOR, justification='center', pad=((0, 0), (15, 10)))],
-                    [sg.Image(filename='', key='image', size=(720, 540), pad=((20, 20), (10, 20)), background_color=BG_CARD)],
+                    [sg.Image(filename='', key='image', size=PREVIEW_SIZE, pad=((20, 20), (10, 20)), background_color=BG_CARD)],
                     [sg.HorizontalSeparator(pad=((20, 20), (10, 10)))],
                     [sg.Column([
                         [sg.Text('🔍 FACE DETECTION', font=('Segoe UI', 12, 'bold'), text_color=TEXT_PRIMARY)],
@@ -366,62 +635,57 @@ def recognize_attendence():
                       background_color=BG_DARK,
                       icon='Images/Facial_Recognition_logo.png')
     
+    # Look the elements up once (the window is already finalized) and only
+    # push a new value to Tk when it differs from what is displayed
+    text_elements = {key: window[key] for key in ('_date_', '_time_', 'total_clockins', 'total_clockouts', 'present_today',
+                                                  'face_status', 'person_name', 'person_id', 'confidence', 'blink_status')}
+    image_element = window['image']
+    shown = {}
+
+    def show(key, value, **kwargs):
+        if shown.get(key) != (value, kwargs):
+            text_elements[key].update(value, **kwargs)
+            shown[key] = (value, kwargs)
+    
     # Initialize statistics
     total_clockins = 0
     total_clockouts = 0
     present_today = 0
-    recognizer = cv2.face.LBPHFaceRecognizer_create()
-    recognizer.read("TrainingImageLabel"+os.sep+"Trainner.yml")
-    faceCascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    # Models and student details are cached across sessions
+    recognizer = _get_recognizer()
+    faceCascade = _get_face_cascade()
     
     # Initialize OpenCV-based blink detection
     blink_detection_available = True
-    detector = None
-    predictor = None
     
     # Load eye cascade classifier for OpenCV blink detection
-    try:
-        eye_cascade_path = cv2.data.haarcascades + 'haarcascade_eye.xml'
-        if os.path.exists(eye_cascade_path):
-            eye_cascade = cv2.CascadeClassifier(eye_cascade_path)
-            print("OpenCV eye cascade loaded successfully!")
-        else:
-            # Try alternative path
-            eye_cascade_path = "haarcascade_eye.xml"
-            if os.path.exists(eye_cascade_path):
-                eye_cascade = cv2.CascadeClassifier(eye_cascade_path)
-                print("Alternative eye cascade loaded successfully!")
-            else:
-                print("Eye cascade not found. Using contour-based blink detection.")
-                eye_cascade = None
-    except Exception as e:
-        print(f"Error loading eye cascade: {e}")
-        eye_cascade = None
+    eye_cascade = _get_eye_cascade()
     
     # Also try to initialize dlib as backup (optional)
-    dlib_available = False
-    try:
+    detector, predictor = _get_dlib_models()
+    dlib_available = predictor is not None
+    if dlib_available:
         import dlib
-        predictor_path = "shape_predictor_68_face_landmarks.dat"
-        if os.path.exists(predictor_path):
-            detector = dlib.get_frontal_face_detector()
-            predictor = dlib.shape_predictor(predictor_path)
-            dlib_available = True
-            print("dlib facial landmarks available as backup!")
-    except ImportError:
-        print("dlib not available. Using OpenCV-based blink detection.")
-    except Exception as e:
-        print(f"dlib initialization error: {e}")
     
+    warm_up_kernels()
     print("Blink detection system initialized!")
     
-    df = pd.read_csv("StudentDetails"+os.sep+"StudentDetails.csv")
-    font = cv2.FONT_HERSHEY_SIMPLEX
+    name_by_id = _get_name_by_id()
     col_names = ['Id', 'Name', 'Date', 'Clock IN Time', 'Clock OUT Time', 'Duration', 'Status']
-    attendance = pd.DataFrame(columns=col_names)
+    col_idx = {name: i for i, name in enumerate(col_names)}
+    # Rows are kept as plain lists and turned into a DataFrame only when saving
+    attendance_rows = []
+    # Row of each clocked-in Id, which Clock OUT updates; also keeps the rows
+    # unique per Id without deduplicating the DataFrame on save
+    id_to_row_idx = {}
     
     # Initialize and start realtime video capture
     cam = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+    # Ask for MJPG so the camera compresses frames in hardware instead of
+    # sending raw frames over USB; frames are still decoded to BGR.
+    # The FOURCC has to be set before the frame size on DirectShow
+    cam.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M', 'J', 'P', 'G'))
+    cam.set(cv2.CAP_PROP_FPS, CAMERA_FPS)
     cam.set(3, 720)  # set video width
     cam.set(4, 540)  # set video height
     # Define min window size to be recognized as a face
@@ -432,33 +696,223 @@ def recognize_attendence():
     blink_counter = 0
     blink_detected = False
     consecutive_blinks = 0
-    EYE_AR_THRESH = 0.21
-    EYE_AR_CONSEC_FRAMES = 2
+    
+    # Cached detection results, refreshed every SKIP_FRAMES frames
+    detect_frame_idx = 0
+    faces = ()
+    face_ids = []
+    
+    # Reused buffer for dlib's 68 facial landmarks
+    landmarks_buf = np.empty((68, 2), dtype=np.int32)
     
     # Liveness detection variables
-    prev_frames = []  # Store previous frames for temporal analysis
+    prev_frames = FrameRing(LIVENESS_HISTORY, LIVENESS_FRAME_SIZE)  # Store previous frames for temporal analysis
     frame_count = 0
     liveness_detected = False
-    debug_mode = False  # Set to True to see detailed detection info
+    
+    def set_status(ui, key, template, *args, **kwargs):
+        # Skipping unchanged values is left to show() on the GUI thread
+        ui[key] = (template.format(*args), kwargs)
+
+    def process_frame(im):
+        """
+        Run detection, recognition and blink analysis on one frame.
+        Returns the annotated frame, the UI updates and the recognized Id/name
+        """
+        nonlocal blink_counter, blink_detected, consecutive_blinks, frame_count, liveness_detected
+        nonlocal detect_frame_idx, faces, face_ids
+        ui = {}
+        Id = None
+        aa = None
+        # The only color conversion per frame: the face cascade, LBPH, dlib
+        # landmarks and the blink/liveness helpers all read this image or slices of it
+        gray = cv2.cvtColor(im, cv2.COLOR_BGR2GRAY)
+        if detect_frame_idx % SKIP_FRAMES == 0:
+            # Run the cascade on a half-size copy (4x fewer pixels) and scale the
+            # boxes back up; recognition still uses the full-resolution face
+            gray_small = cv2.resize(gray, None, fx=DETECT_SCALE, fy=DETECT_SCALE, interpolation=cv2.INTER_AREA)
+            faces = faceCascade.detectMultiScale(gray_small, 1.2, 5,minSize = (int(minW*DETECT_SCALE), int(minH*DETECT_SCALE)),flags = cv2.CASCADE_SCALE_IMAGE)
+            if len(faces) > 0:
+                faces = (faces / DETECT_SCALE).astype(int)
+            face_ids = [recognizer.predict(gray[y:y+h, x:x+w]) for (x, y, w, h) in faces]
+        detect_frame_idx += 1
+        
+        # Update face detection status with professional styling
+        if len(faces) == 0:
+            set_status(ui, 'face_status', NO_FACE_TEXT, text_color=WARNING_COLOR, background_color=BG_CARD)
+            # Clear person info when no face is detected
+            set_status(ui, 'person_name', NAME_TMPL, '')
+            set_status(ui, 'person_id', ID_TMPL, '')
+            set_status(ui, 'confidence', CONFIDENCE_TMPL, 0)
+            set_status(ui, 'blink_status', NO_BLINK_TEXT, text_color=WARNING_COLOR, background_color=BG_CARD)
+            # Nothing to verify: skip the blink/liveness work entirely, and drop
+            # the stored face history so it isn't compared against whoever
+            # appears next
+            prev_frames.clear()
+            return im, ui, Id, aa
+        set_status(ui, 'face_status', FACE_TEXT, text_color=SUCCESS_COLOR, background_color=BG_CARD)
+        
+        # Run the landmark predictor on all faces first, back to back, before
+        # any of the per-face drawing and blink analysis
+        shapes = [None] * len(faces)
+        if dlib_available and detector and predictor:
+            shapes = [predictor(gray, dlib.rectangle(int(x), int(y), int(x + w), int(y + h)))
+                      for (x, y, w, h) in faces]
+        
+        # Blink detection for each detected face
+        blink_detected_current = False
+        for (x, y, w, h), (Id, conf), shape in zip(faces, face_ids, shapes):
+            cv2.rectangle(im, (x, y), (x+w, y+h), (10, 159, 255), 2)
+            # The blink helpers share the frame's grayscale conversion
+            gray_face = gray[y:y+h, x:x+w]
+            confidence_percent = round(100 - conf)
+            
+            # Blink detection using multiple methods
+            blink_detected_current = False
+            
+            # Method 1: Try dlib facial landmarks (if available)
+            if shape is not None:
+                # Extract eye coordinates (points 36-47) into the landmark buffer
+                landmarks = shape_to_np(shape, landmarks_buf, 36, 48)
+                # Left and right eye as a (2, 6, 2) array
+                eyes = landmarks[36:48].reshape(2, 6, 2)
+                
+                # Calculate both eye aspect ratios in one call and average them
+                ear = eye_aspect_ratios(eyes).mean()
+                
+                # Draw both eye outlines in one call
+                cv2.polylines(im, list(eyes), True, (0, 255, 0), 1)
+                
+                # Blink detection logic
+                if ear < EYE_AR_THRESH:
+                    blink_counter += 1
+                    if blink_counter >= EYE_AR_CONSEC_FRAMES:
+                        blink_detected = True
+                        blink_detected_current = True
+                        consecutive_blinks += 1
+                else:
+                    blink_counter = 0
+                    blink_detected = False
+                
+                # Update blink status in UI
+                if blink_detected_current:
+                    set_status(ui, 'blink_status', BLINK_TMPL, 'dlib', consecutive_blinks, text_color=SUCCESS_COLOR, background_color=BG_CARD)
+                else:
+                    set_status(ui, 'blink_status', EYES_OPEN_TMPL, 'dlib', text_color=TEXT_SECONDARY, background_color=BG_CARD)
+            
+            # Method 2: OpenCV Haar cascade + contour analysis
+            if not blink_detected_current and eye_cascade:
+                if detect_blink_opencv(gray_face, eye_cascade):
+                    blink_detected = True
+                    blink_detected_current = True
+                    consecutive_blinks += 1
+                    set_status(ui, 'blink_status', BLINK_TMPL, 'OpenCV', consecutive_blinks, text_color=SUCCESS_COLOR, background_color=BG_CARD)
+                else:
+                    if not blink_detected_current:
+                        set_status(ui, 'blink_status', EYES_OPEN_TMPL, 'OpenCV', text_color=TEXT_SECONDARY, background_color=BG_CARD)
+            
+            # Method 3: Advanced liveness detection with temporal analysis
+            if not blink_detected_current:
+                frame_count += 1
+                
+                # Use advanced liveness detection
+                blink_result, status_message = detect_liveness_blink(gray_face, prev_frames, frame_count)
+                
+                if blink_result:
+                    blink_detected = True
+                    blink_detected_current = True
+                    consecutive_blinks += 1
+                    liveness_detected = True
+                    set_status(ui, 'blink_status', LIVE_BLINK_TMPL, status_message, consecutive_blinks, text_color=SUCCESS_COLOR, background_color=BG_CARD)
+                else:
+                    if not blink_detected_current:
+                        if "Static image" in status_message:
+                            set_status(ui, 'blink_status', STATIC_IMAGE_TMPL, status_message, text_color=DANGER_COLOR, background_color=BG_CARD)
+                        else:
+                            set_status(ui, 'blink_status', LIVENESS_STATUS_TMPL, status_message, text_color=TEXT_SECONDARY, background_color=BG_CARD)
+            
+            if conf < 100:
+                name = name_by_id.get(int(Id))
+                aa = [name] if name else []
+                confstr = "  {0}%".format(confidence_percent)
+                tt = f"{Id}-{name}" if name else ""
+                
+                # Update UI with recognized person info
+                if len(aa) > 0:
+                    set_status(ui, 'person_name', NAME_TMPL, aa[0])
+                    set_status(ui, 'person_id', ID_TMPL, Id)
+                    set_status(ui, 'confidence', CONFIDENCE_TMPL, confidence_percent)
+            else:
+                Id = 'Unknown'
+                tt = Id
+                confstr = "  {0}%".format(confidence_percent)
+                
+                # Update UI for unknown person
+                set_status(ui, 'person_name', NAME_TMPL, 'Unknown')
+                set_status(ui, 'person_id', ID_TMPL, 'Unknown')
+                set_status(ui, 'confidence', CONFIDENCE_TMPL, confidence_percent)
+                
+            if (100-conf) > 67:
+                tt = tt + " [Pass]"
+            cv2.putText(im, tt, (x + 5, y - 5), FONT, 1, LABEL_COLOR, 2, cv2.LINE_AA)
+            bucket = (100-conf > 50) + (100-conf > 67)
+            cv2.putText(im, confstr, (x + 5, y + h - 5), FONT, 1, COLOR_LUT[bucket], 1)
+        
+        return im, ui, Id, aa
 
     lecture = sg.popup_get_text('Please Enter Lecture Duration', 'HH:MM:SS')
 
+    # Capture, detection, preview encoding and drawing run as a pipeline so
+    # that reading frame N+1, processing frame N and encoding/drawing earlier
+    # frames overlap. The bounded queues apply back-pressure and keep memory
+    # use constant. Only the GUI thread touches the window.
+    capture_q = queue.Queue(maxsize=2)
+    detect_q = queue.Queue(maxsize=2)
+    display_q = queue.Queue(maxsize=2)
+    stop_event = threading.Event()
+    workers = [threading.Thread(target=_capture_loop, args=(cam, capture_q, stop_event), daemon=True),
+               threading.Thread(target=_detect_loop, args=(process_frame, capture_q, detect_q, stop_event), daemon=True),
+               threading.Thread(target=_encode_loop, args=(detect_q, display_q, stop_event), daemon=True)]
+    for worker in workers:
+        worker.start()
+
+    def stop_pipeline():
+        stop_event.set()
+        for worker in workers:
+            worker.join(timeout=1)
+
+    # Last recognized person, used by the Clock IN / Clock OUT handlers
+    Id = None
+    aa = []
+
+    # The clock only changes once a second and the statistics only on clock in/out
+    last_sec = 0
+    last_stats = None
+
     while True:
-        event, values = window.read(timeout=1)
+        # Wait up to one frame interval; frames that arrive meanwhile are
+        # drained together below
+        event, values = window.read(timeout=1000 // CAMERA_FPS)
         
         # Update time displays
-        current_time = datetime.datetime.fromtimestamp(time.time())
-        window.find_element('_date_').update(f'Date: {current_time.strftime("%Y-%m-%d")}')
-        window.find_element('_time_').update(f'Time: {current_time.strftime("%H:%M:%S")}')
+        sec = int(time.time())
+        if sec != last_sec:
+            current_time = datetime.datetime.fromtimestamp(sec)
+            show('_date_', f'Date: {current_time.strftime("%Y-%m-%d")}')
+            show('_time_', f'Time: {current_time.strftime("%H:%M:%S")}')
+            last_sec = sec
         
         # Update statistics
-        window.find_element('total_clockins').update(f'Total Clock-ins: {total_clockins}')
-        window.find_element('total_clockouts').update(f'Total Clock-outs: {total_clockouts}')
-        window.find_element('present_today').update(f'Present Today: {present_today}')
+        stats = (total_clockins, total_clockouts, present_today)
+        if stats != last_stats:
+            show('total_clockins', f'Total Clock-ins: {total_clockins}')
+            show('total_clockouts', f'Total Clock-outs: {total_clockouts}')
+            show('present_today', f'Present Today: {present_today}')
+            last_stats = stats
         if event == 'Back':
             c = sg.PopupYesNo(f'Save Attendance ?')
             if c == 'No':
-                cam.release()
+                stop_pipeline()
                 cv2.destroyAllWindows()
                 window.close()
             elif c == 'Yes':
@@ -467,8 +921,9 @@ def recognize_attendence():
                 timeStamp = datetime.datetime.fromtimestamp(ts).strftime('%H:%M:%S')
                 Hour, Minute, Second = timeStamp.split(":")
                 fileName = "Attendance"+os.sep+"Attendance_"+date+"_"+Hour+"-"+Minute+"-"+Second+".csv"
+                attendance = pd.DataFrame(attendance_rows, columns=col_names)
                 attendance.to_csv(fileName, index=False)
-                cam.release()
+                stop_pipeline()
                 cv2.destroyAllWindows()
                 window.close()
                 sg.popup_timed('Attendance Successful')
@@ -479,15 +934,16 @@ def recognize_attendence():
             timeStamp = datetime.datetime.fromtimestamp(ts).strftime('%H:%M:%S')
             Hour, Minute, Second = timeStamp.split(":")
             fileName = "Attendance"+os.sep+"Attendance_"+date+"_"+Hour+"-"+Minute+"-"+Second+".csv"
+            attendance = pd.DataFrame(attendance_rows, columns=col_names)
             attendance.to_csv(fileName, index=False)
-            cam.release()
+            stop_pipeline()
             cv2.destroyAllWindows()
             window.close()
             sg.popup_timed('Attendance Successful')
             break
         elif event == 'Clock IN':
             # Check if a face is detected and recognized
-            if 'aa' in locals() and len(aa) > 0:
+            if len(aa) > 0:
                 # Basic verification - just check if face is detected
                 sg.popup_timed('✅ Face detected and recognized!', title='Verification Successful')
                 
@@ -496,17 +952,19 @@ def recognize_attendence():
                     ts = time.time()
                     date = datetime.datetime.fromtimestamp(ts).strftime('%Y-%m-%d')
                     timeStamp = datetime.datetime.fromtimestamp(ts).strftime('%H:%M:%S')
-                    aa_clean = str(aa)[2:-2]
-                    attendance.loc[len(attendance)] = [Id, aa_clean, date, timeStamp, '-', '-', '-']
+                    # Only an Id's first clock-in is recorded
+                    if Id not in id_to_row_idx:
+                        id_to_row_idx[Id] = len(attendance_rows)
+                        attendance_rows.append([Id, aa[0], date, timeStamp, '-', '-', '-'])
                     total_clockins += 1
-                    sg.popup_timed(f'Clocked IN successfully for {aa_clean}')
+                    sg.popup_timed(f'Clocked IN successfully for {aa[0]}')
                 elif check == 'No':
                     print('Not clocked IN')
             else:
                 sg.popup_timed('No face detected or recognized. Please position your face properly.')
         elif event == 'Clock OUT':
             # Check if a face is detected and recognized
-            if 'aa' in locals() and len(aa) > 0:
+            if len(aa) > 0:
                 # Basic verification - just check if face is detected
                 sg.popup_timed('✅ Face detected and recognized!', title='Verification Successful')
                 
@@ -516,21 +974,20 @@ def recognize_attendence():
                     timeStamp = datetime.datetime.fromtimestamp(ts).strftime('%H:%M:%S')
                     
                     # Find the attendance record for this person
-                    attendance_indices = attendance[attendance['Id'] == Id].index.values
-                    
-                    if len(attendance_indices) > 0:
+                    if Id in id_to_row_idx:
+                        row = attendance_rows[id_to_row_idx[Id]]
                         # Update clock out time
-                        attendance.at[attendance_indices[0], 'Clock OUT Time'] = timeStamp
+                        row[col_idx['Clock OUT Time']] = timeStamp
                         
                         # Calculate duration
-                        co = attendance.loc[attendance_indices[0], 'Clock OUT Time']
-                        ci = attendance.loc[attendance_indices[0], 'Clock IN Time']
+                        co = row[col_idx['Clock OUT Time']]
+                        ci = row[col_idx['Clock IN Time']]
                         
                         if co != '-' and ci != '-':
                             FMT = '%H:%M:%S'
                             try:
                                 duration = datetime.datetime.strptime(str(co), FMT) - datetime.datetime.strptime(str(ci), FMT)
-                                attendance.at[attendance_indices[0], 'Duration'] = str(duration)
+                                row[col_idx['Duration']] = str(duration)
                                 
                                 # Calculate status based on lecture duration
                                 if lecture:
@@ -540,15 +997,15 @@ def recognize_attendence():
                                         diff_minutes = abs((lecture_duration - duration_dt).total_seconds() / 60)
                                         
                                         if diff_minutes <= 5:
-                                            attendance.at[attendance_indices[0], 'Status'] = 'Present'
+                                            row[col_idx['Status']] = 'Present'
                                             present_today += 1
                                         else:
-                                            attendance.at[attendance_indices[0], 'Status'] = 'MCR'
+                                            row[col_idx['Status']] = 'MCR'
                                     except:
-                                        attendance.at[attendance_indices[0], 'Status'] = 'Present'
+                                        row[col_idx['Status']] = 'Present'
                                         present_today += 1
                                 else:
-                                    attendance.at[attendance_indices[0], 'Status'] = 'Present'
+                                    row[col_idx['Status']] = 'Present'
                                     present_today += 1
                                     
                                 total_clockouts += 1
@@ -563,163 +1020,37 @@ def recognize_attendence():
             else:
                 sg.popup_timed('No face detected or recognized. Please position your face properly.')
 
-        ret, im = cam.read()
-        gray = cv2.cvtColor(im, cv2.COLOR_BGR2GRAY)
-        faces = faceCascade.detectMultiScale(gray, 1.2, 5,minSize = (int(minW), int(minH)),flags = cv2.CASCADE_SCALE_IMAGE)
-        
-        # Update face detection status with professional styling
-        if len(faces) > 0:
-            window.find_element('face_status').update('✅ Face detected', text_color=SUCCESS_COLOR, background_color=BG_CARD)
-        else:
-            window.find_element('face_status').update('❌ No face detected', text_color=WARNING_COLOR, background_color=BG_CARD)
-            # Clear person info when no face is detected
-            window.find_element('person_name').update('Name: ')
-            window.find_element('person_id').update('ID: ')
-            window.find_element('confidence').update('0%')
-            window.find_element('blink_status').update('No blink detected', text_color=WARNING_COLOR, background_color=BG_CARD)
-        
-        # Blink detection for each detected face
-        blink_detected_current = False
-        for(x, y, w, h) in faces:
-            cv2.rectangle(im, (x, y), (x+w, y+h), (10, 159, 255), 2)
-            Id, conf = recognizer.predict(gray[y:y+h, x:x+w])
-            confidence_percent = round(100 - conf)
-            
-            # Blink detection using multiple methods
-            blink_detected_current = False
-            
-            # Method 1: Try dlib facial landmarks (if available)
-            if dlib_available and detector and predictor:
-                try:
-                    # Convert ROI to dlib format
-                    dlib_rect = dlib.rectangle(int(x), int(y), int(x + w), int(y + h))
-                    landmarks = predictor(gray, dlib_rect)
-                    
-                    # Extract eye coordinates
-                    left_eye = np.array([(landmarks.part(36).x, landmarks.part(36).y),
-                                       (landmarks.part(37).x, landmarks.part(37).y),
-                                       (landmarks.part(38).x, landmarks.part(38).y),
-                                       (landmarks.part(39).x, landmarks.part(39).y),
-                                       (landmarks.part(40).x, landmarks.part(40).y),
-                                       (landmarks.part(41).x, landmarks.part(41).y)])
-                    
-                    right_eye = np.array([(landmarks.part(42).x, landmarks.part(42).y),
-                                        (landmarks.part(43).x, landmarks.part(43).y),
-                                        (landmarks.part(44).x, landmarks.part(44).y),
-                                        (landmarks.part(45).x, landmarks.part(45).y),
-                                        (landmarks.part(46).x, landmarks.part(46).y),
-                                        (landmarks.part(47).x, landmarks.part(47).y)])
-                    
-                    # Calculate eye aspect ratios
-                    left_ear = eye_aspect_ratio(left_eye)
-                    right_ear = eye_aspect_ratio(right_eye)
-                    ear = (left_ear + right_ear) / 2.0
-                    
-                    # Draw eye landmarks
-                    for point in left_eye:
-                        cv2.circle(im, tuple(point), 2, (0, 255, 0), -1)
-                    for point in right_eye:
-                        cv2.circle(im, tuple(point), 2, (0, 255, 0), -1)
-                    
-                    # Blink detection logic
-                    if ear < EYE_AR_THRESH:
-                        blink_counter += 1
-                        if blink_counter >= EYE_AR_CONSEC_FRAMES:
-                            blink_detected = True
-                            blink_detected_current = True
-                            consecutive_blinks += 1
-                    else:
-                        blink_counter = 0
-                        blink_detected = False
-                    
-                    # Update blink status in UI
-                    if blink_detected_current:
-                        window.find_element('blink_status').update(f'✅ Blink detected (dlib) ({consecutive_blinks})', text_color=SUCCESS_COLOR, background_color=BG_CARD)
-                    else:
-                        window.find_element('blink_status').update('👁️ Eyes open (dlib)', text_color=TEXT_SECONDARY, background_color=BG_CARD)
-                        
-                except Exception as e:
-                    print(f"dlib blink detection error: {e}")
-                    # Fall back to OpenCV method
-                    pass
-            
-            # Method 2: OpenCV Haar cascade + contour analysis
-            if not blink_detected_current and eye_cascade:
-                try:
-                    face_roi = im[y:y+h, x:x+w]
-                    if detect_blink_opencv(face_roi, eye_cascade):
-                        blink_detected = True
-                        blink_detected_current = True
-                        consecutive_blinks += 1
-                        window.find_element('blink_status').update(f'✅ Blink detected (OpenCV) ({consecutive_blinks})', text_color=SUCCESS_COLOR, background_color=BG_CARD)
-                    else:
-                        if not blink_detected_current:
-                            window.find_element('blink_status').update('👁️ Eyes open (OpenCV)', text_color=TEXT_SECONDARY, background_color=BG_CARD)
-                except Exception as e:
-                    print(f"OpenCV blink detection error: {e}")
-            
-            # Method 3: Advanced liveness detection with temporal analysis
-            if not blink_detected_current:
-                try:
-                    face_roi = im[y:y+h, x:x+w]
-                    frame_count += 1
-                    
-                    # Use advanced liveness detection
-                    blink_result, status_message = detect_liveness_blink(face_roi, prev_frames, frame_count)
-                    
-                    if blink_result:
-                        blink_detected = True
-                        blink_detected_current = True
-                        consecutive_blinks += 1
-                        liveness_detected = True
-                        window.find_element('blink_status').update(f'✅ {status_message} ({consecutive_blinks})', text_color=SUCCESS_COLOR, background_color=BG_CARD)
-                    else:
-                        if not blink_detected_current:
-                            if "Static image" in status_message:
-                                window.find_element('blink_status').update(f'❌ {status_message}', text_color=DANGER_COLOR, background_color=BG_CARD)
-                            else:
-                                window.find_element('blink_status').update(f'👁️ {status_message}', text_color=TEXT_SECONDARY, background_color=BG_CARD)
-                except Exception as e:
-                    print(f"Liveness detection error: {e}")
-                    window.find_element('blink_status').update('⚠️ Liveness detection error', text_color=WARNING_COLOR, background_color=BG_CARD)
-            
-            if conf < 100:
-                aa = df.loc[df['Id'] == Id]['Name'].values
-                confstr = "  {0}%".format(confidence_percent)
-                tt = str(Id)+"-"+aa
-                
-                # Update UI with recognized person info
-                if len(aa) > 0:
-                    window.find_element('person_name').update(f'Name: {aa[0]}')
-                    window.find_element('person_id').update(f'ID: {Id}')
-                    window.find_element('confidence').update(f'{confidence_percent}%')
-            else:
-                Id = '  Unknown  '
-                tt = str(Id)
-                confstr = "  {0}%".format(confidence_percent)
-                
-                # Update UI for unknown person
-                window.find_element('person_name').update('Name: Unknown')
-                window.find_element('person_id').update('ID: Unknown')
-                window.find_element('confidence').update(f'{confidence_percent}%')
-                
-            tt = str(tt)[2:-2]
-            if(100-conf) > 67:
-                tt = tt + " [Pass]"
-                cv2.putText(im, str(tt), (x+5,y-5), font, 1, (255, 255, 255), 2)
-            else:
-                cv2.putText(im, str(tt), (x + 5, y - 5), font, 1, (255, 255, 255), 2)
-            if (100-conf) > 67:
-                cv2.putText(im, str(confstr), (x + 5, y + h - 5), font,1, (0, 255, 0),1 )
-            elif (100-conf) > 50:
-                cv2.putText(im, str(confstr), (x + 5, y + h - 5), font, 1, (0, 255, 255), 1)
-            else:
-                cv2.putText(im, str(confstr), (x + 5, y + h - 5), font, 1, (0, 0, 255), 1)
-                
-        attendance = attendance.drop_duplicates(subset=['Id'], keep='first')
-        imgbytes = cv2.imencode(".png", im)[1].tobytes()
-        window["image"].update(data=imgbytes)
+        # Take every frame that is ready and draw only the newest, so the
+        # preview never falls behind the camera when a GUI tick runs long
+        items = []
+        while True:
+            try:
+                items.append(display_q.get_nowait())
+            except queue.Empty:
+                break
+        if not items:
+            continue
+        if items[-1] is None:
+            # A pipeline stage failed and the preview has stopped. Forget the
+            # last recognized person so nobody can be clocked in from a stale frame
+            Id = None
+            aa = []
+            show('face_status', PIPELINE_ERROR_TEXT, text_color=DANGER_COLOR, background_color=BG_CARD)
+            show('person_name', 'Name: ')
+            show('person_id', 'ID: ')
+            show('confidence', '0%')
+            continue
+        # Later frames' status texts override earlier ones
+        ui = {}
+        for imgbytes, frame_ui, frame_id, frame_aa in items:
+            ui.update(frame_ui)
+            if frame_id is not None:
+                Id = frame_id
+            if frame_aa is not None:
+                aa = frame_aa
+        for key, (value, kwargs) in ui.items():
+            show(key, value, **kwargs)
+        image_element.update(data=imgbytes)
 
-    cam.release()
+    stop_pipeline()
     cv2.destroyAllWindows()
-    os.system('cls')
@@ -1,7 +1,6 @@
 import os
 import cv2
 import numpy as np
-from PIL import Image
 import PySimpleGUI as sg
 
 # image labesl
@@ -16,10 +15,11 @@ def getImagesAndLabels(path):
     # now looping through all the image paths and loading the Ids and the images
     i = 1
     for imagePath in imagePaths:
-        # loading the image and converting it to gray scale
-        pilImage = Image.open(imagePath).convert('L')
-        # Now we are converting the PIL image into numpy array
-        imageNp = np.array(pilImage, 'uint8')
+        # loading the image straight into a grayscale uint8 numpy array
+        imageNp = cv2.imread(imagePath, cv2.IMREAD_GRAYSCALE)
+        # imread returns None instead of raising for unreadable files
+        if imageNp is None:
+            raise OSError(f"Cannot read training image: {imagePath}")
         # getting the Id from the image
         Id = int(os.path.split(imagePath)[-1].split(".")[1])
         # extract the face from the training image sample